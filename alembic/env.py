@@ -4,7 +4,7 @@ from sqlalchemy import engine_from_config, pool
 
 from alembic import context
 from sensor_api.config import DATABASE_URL_SYNC
-from sensor_api.data.models import Base
+from sensor_api.data.models import metadata
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -19,7 +19,7 @@ if config.config_file_name is not None:
 # for 'autogenerate' support
 
 
-target_metadata = Base.metadata
+target_metadata = metadata
 
 # Set database URL from config - use async URL for async template
 config.set_main_option("sqlalchemy.url", DATABASE_URL_SYNC)
@@ -0,0 +1,34 @@
+"""add_sensors_table
+
+Revision ID: 4c5aa74be5fb
+Revises: 0872e89e8798
+Create Date: 2026-10-15 00:40:12.318204
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "4c5aa74be5fb"
+down_revision: str | Sequence[str] | None = "0872e89e8798"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "sensors",
+        sa.Column("sensor_id", sa.Text(), nullable=False),
+        sa.PrimaryKeyConstraint("sensor_id"),
+    )
+    op.execute("INSERT INTO sensors (sensor_id) SELECT DISTINCT sensor_id FROM sensor_metrics;")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("sensors")
@@ -0,0 +1,63 @@
+"""add_sensor_metrics_hourly_rollup
+
+Revision ID: b56e00104a05
+Revises: 4c5aa74be5fb
+Create Date: 2026-10-15 00:51:37.602114
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b56e00104a05"
+down_revision: str | Sequence[str] | None = "4c5aa74be5fb"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Continuous aggregates cannot be created inside a transaction block
+    with op.get_context().autocommit_block():
+        op.execute(
+            """
+            CREATE MATERIALIZED VIEW sensor_metrics_hourly
+            WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+            SELECT
+                time_bucket(INTERVAL '1 hour', timestamp) AS bucket,
+                sensor_id,
+                min(temperature) AS temperature_min,
+                max(temperature) AS temperature_max,
+                sum(temperature) AS temperature_sum,
+                count(temperature) AS temperature_count,
+                min(humidity) AS humidity_min,
+                max(humidity) AS humidity_max,
+                sum(humidity) AS humidity_sum,
+                count(humidity) AS humidity_count,
+                min(pressure) AS pressure_min,
+                max(pressure) AS pressure_max,
+                sum(pressure) AS pressure_sum,
+                count(pressure) AS pressure_count
+            FROM sensor_metrics
+            GROUP BY bucket, sensor_id
+            WITH NO DATA;
+            """
+        )
+        op.execute(
+            """
+            SELECT add_continuous_aggregate_policy(
+                'sensor_metrics_hourly',
+                start_offset => INTERVAL '32 days',
+                end_offset => INTERVAL '1 hour',
+                schedule_interval => INTERVAL '15 minutes'
+            );
+            """
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.execute("DROP MATERIALIZED VIEW IF EXISTS sensor_metrics_hourly;")
@@ -1,52 +1,66 @@
 from typing import Annotated
 
 import msgspec
-from litestar import Router, get, post
+from litestar import Response, Router, get, post
 from litestar.connection import Request
+from litestar.enums import MediaType
 from litestar.exceptions import HTTPException, ValidationException
+from litestar.openapi.datastructures import ResponseSpec
 from litestar.params import Parameter
 from litestar.status_codes import HTTP_201_CREATED
 
 from sensor_api.api.utils import (
     compute_date_range_from_days,
+    describe_param,
+    format_date_range,
     parse_metrics_param,
     parse_sensors_param,
-    parse_stat,
+    parse_stats,
 )
 from sensor_api.api.validators import validate_ingest_payload
 from sensor_api.data.models import (
     MetricType,
-    SensorData,
     SensorIngestPayload,
     SensorQuery,
     SensorQueryResponse,
+    SensorReadingsResponse,
 )
+from sensor_api.storage.timescaledb import READINGS_LIMIT
+
+_INGEST_DECODER = msgspec.json.Decoder(SensorIngestPayload)
+_JSON_MEDIA_TYPE = "application/json"
+_RESPONSE_ENCODER = msgspec.json.Encoder()
+# Query handlers return pre-encoded bytes; this keeps their OpenAPI response schema
+_QUERY_RESPONSES = {
+    200: ResponseSpec(data_container=SensorQueryResponse, description="Request fulfilled, document follows")
+}
+_READINGS_RESPONSES = {
+    200: ResponseSpec(data_container=SensorReadingsResponse, description="Request fulfilled, document follows")
+}
+
+
+def _encode_query_response(response: SensorQueryResponse | SensorReadingsResponse) -> Response[bytes]:
+    """Encode a query response directly, skipping Litestar's return-value serialization"""
+    return Response(content=_RESPONSE_ENCODER.encode(response), media_type=MediaType.JSON)
 
 
 @post("/sensors/{sensor_id:str}/data", status_code=HTTP_201_CREATED)
 async def ingest_sensor_data(sensor_id: str, request: Request) -> dict[str, str]:
     """Ingest sensor data for specific sensor"""
     raw = await request.body()
-    content_type = (request.headers.get("content-type") or "").split(";")[0].strip().lower()
-    if "json" not in content_type:
+    content_type = request.headers.get("content-type", "")
+    if content_type.partition(";")[0].strip().lower() != _JSON_MEDIA_TYPE:
         raise ValidationException("Content-Type must be application/json")
     try:
-        payload = msgspec.json.decode(raw, type=SensorIngestPayload)
+        payload = _INGEST_DECODER.decode(raw)
     except Exception as e:
         raise ValidationException(f"Invalid JSON body: {e}") from e
 
-    sensor_data = SensorData(
-        sensor_id=sensor_id,
-        metrics=payload.metrics,
-        timestamp=payload.timestamp,
-        location=payload.location,
-        sensor_type=payload.sensor_type,
-    )
     try:
         validate_ingest_payload(sensor_id, payload)
 
         storage = request.app.state.storage
-        await storage.store_sensor_data(sensor_data)
+        await storage.store_record(payload.to_record(sensor_id))
         return {"message": "Sensor data stored successfully", "sensor_id": sensor_id}
     except Exception as e:
         if isinstance(e, ValidationException):
@@ -54,62 +68,95 @@ async def ingest_sensor_data(sensor_id: str, request: Request) -> dict[str, str]
         raise HTTPException(status_code=500, detail=f"Failed to store sensor data: {str(e)}") from e
 
 
-@get("/sensors/{sensor_id:str}/data")
+@get("/sensors/{sensor_id:str}/data", responses=_QUERY_RESPONSES)
 async def get_single_sensor_data(
     sensor_id: str,
     request: Request,
     metrics: Annotated[str | None, Parameter(description="Comma-separated metrics")] = None,
-    stat: Annotated[str, Parameter(description="Statistic: average, min, max, sum")] = "average",
+    stat: Annotated[
+        str, Parameter(description="Statistic: average, min, max, sum; comma-separated for several")
+    ] = "average",
     days: Annotated[int | None, Parameter(description="Days back from now")] = None,
-) -> SensorQueryResponse:
+) -> Response[bytes]:
     """Query data for single sensor"""
     metric_list = parse_metrics_param(metrics)
-    statistic = parse_stat(stat)
+    statistics = parse_stats(stat)
     start_date, end_date = compute_date_range_from_days(days)
 
     storage = request.app.state.storage
 
     query = SensorQuery(
-        sensor_ids=[sensor_id],
+        sensor_ids=(sensor_id,),
         metrics=metric_list,
-        statistic=statistic,
+        statistics=statistics,
         start_date=start_date,
         end_date=end_date,
     )
 
     results = await storage.query_sensor_data(query)
 
-    return SensorQueryResponse(
+    response = SensorQueryResponse(
         results=results,
         query_info={
             "sensors": sensor_id,
-            "metrics": ",".join(metric_list) if metric_list else "all",
-            "statistic": statistic.value,
-            "date_range": f"{start_date.isoformat()} to {end_date.isoformat()}",
+            "metrics": describe_param(metric_list),
+            "statistic": describe_param(statistics),
+            "date_range": format_date_range(start_date, end_date),
         },
         message=f"Retrieved data for sensor {sensor_id}",
     )
+    return _encode_query_response(response)
+
+
+@get("/sensors/{sensor_id:str}/data/raw", responses=_READINGS_RESPONSES)
+async def get_single_sensor_readings(
+    sensor_id: str,
+    request: Request,
+    metrics: Annotated[str | None, Parameter(description="Comma-separated metrics")] = None,
+    days: Annotated[int | None, Parameter(description="Days back from now")] = None,
+) -> Response[bytes]:
+    """Query raw stored readings for single sensor"""
+    metric_list = parse_metrics_param(metrics)
+    start_date, end_date = compute_date_range_from_days(days)
+
+    storage = request.app.state.storage
+    readings, truncated = await storage.query_sensor_readings(sensor_id, metric_list, start_date, end_date)
+
+    response = SensorReadingsResponse(
+        results=readings,
+        truncated=truncated,
+        query_info={
+            "sensors": sensor_id,
+            "metrics": describe_param(metric_list),
+            "date_range": format_date_range(start_date, end_date),
+            "limit": READINGS_LIMIT,
+        },
+        message=f"Retrieved {len(readings)} readings for sensor {sensor_id}",
+    )
+    return _encode_query_response(response)
 
 
-@get("/sensors/data")
+@get("/sensors/data", responses=_QUERY_RESPONSES)
 async def get_multi_sensor_data(
     request: Request,
     sensors: Annotated[str | None, Parameter(description="Comma-separated sensor IDs")] = None,
     metrics: Annotated[str | None, Parameter(description="Comma-separated metrics")] = None,
-    stat: Annotated[str, Parameter(description="Statistic: average, min, max, sum")] = "average",
+    stat: Annotated[
+        str, Parameter(description="Statistic: average, min, max, sum; comma-separated for several")
+    ] = "average",
     days: Annotated[int | None, Parameter(description="Days back from now")] = None,
-) -> SensorQueryResponse:
+) -> Response[bytes]:
     """Query data for multiple sensors"""
 
     sensor_list = parse_sensors_param(sensors)
     metric_list = parse_metrics_param(metrics)
-    statistic = parse_stat(stat)
+    statistics = parse_stats(stat)
     start_date, end_date = compute_date_range_from_days(days)
 
     query = SensorQuery(
         sensor_ids=sensor_list,
         metrics=metric_list,
-        statistic=statistic,
+        statistics=statistics,
         start_date=start_date,
         end_date=end_date,
     )
@@ -117,16 +164,17 @@ async def get_multi_sensor_data(
     storage = request.app.state.storage
     results = await storage.query_sensor_data(query)
 
-    return SensorQueryResponse(
+    response = SensorQueryResponse(
         results=results,
         query_info={
-            "sensors": ",".join(sensor_list) if sensor_list else "all",
-            "metrics": ",".join(metric_list) if metric_list else "all",
-            "statistic": statistic.value,
-            "date_range": f"{start_date.isoformat()} to {end_date.isoformat()}",
+            "sensors": describe_param(sensor_list),
+            "metrics": describe_param(metric_list),
+            "statistic": describe_param(statistics),
+            "date_range": format_date_range(start_date, end_date),
         },
         message=f"Retrieved data for {len(results)} sensors",
     )
+    return _encode_query_response(response)
 
 
 @get("/sensors")
@@ -154,6 +202,7 @@ sensor_router = Router(
     route_handlers=[
         ingest_sensor_data,
         get_single_sensor_data,
+        get_single_sensor_readings,
         get_multi_sensor_data,
         list_sensors,
         list_metrics,
@@ -1,25 +1,44 @@
 from __future__ import annotations
 
-from collections.abc import Iterable
+import time
 from datetime import UTC, datetime, timedelta
+from functools import lru_cache
+from types import MappingProxyType
 
 from litestar.exceptions import ValidationException
 
 from sensor_api.data.models import Statistic
 
+_STAT_ALIASES = MappingProxyType(
+    {
+        "average": Statistic.AVG,
+        "min": Statistic.MIN,
+        "max": Statistic.MAX,
+        "sum": Statistic.SUM,
+    }
+)
+
+# days_back -> (epoch second, start, end); requests within the same second share one window
+_date_range_cache: dict[int, tuple[int, datetime, datetime]] = {}
 
-def _dedupe_preserve_order(items: Iterable[str]) -> list[str]:
+
+def _split_unique(raw: str) -> tuple[str, ...]:
+    """Split, trim, drop empties and de-duplicate a comma-separated string in one pass."""
     seen: set[str] = set()
     result: list[str] = []
-    for it in items:
-        if it and it not in seen:
-            seen.add(it)
-            result.append(it)
-    return result
+    for part in raw.split(","):
+        # Only pay for strip() when the token is actually padded
+        if part and (part[0].isspace() or part[-1].isspace()):
+            part = part.strip()
+        if part and part not in seen:
+            seen.add(part)
+            result.append(part)
+    return tuple(result)
 
 
-def parse_sensors_param(raw: str | None) -> list[str] | None:
-    """Parse a comma-separated sensors string into a de-duplicated list.
+@lru_cache(maxsize=512)
+def parse_sensors_param(raw: str | None) -> tuple[str, ...] | None:
+    """Parse a comma-separated sensors string into a de-duplicated tuple.
 
     - Trims whitespace
     - Removes empties
@@ -28,25 +47,25 @@ def parse_sensors_param(raw: str | None) -> list[str] | None:
     """
     if not raw:
         return None
-    parts = [p.strip() for p in raw.split(",")]
-    result = _dedupe_preserve_order([p for p in parts if p])
+    result = _split_unique(raw)
     return result if result else None
 
 
-def parse_metrics_param(raw: str | None) -> list[str]:
-    """Parse a comma-separated metrics string into a de-duplicated list.
+@lru_cache(maxsize=512)
+def parse_metrics_param(raw: str | None) -> tuple[str, ...]:
+    """Parse a comma-separated metrics string into a de-duplicated tuple.
 
     - Trims whitespace
     - Removes empties
     - Preserves order while de-duplicating
-    - Returns empty list if None (means "all metrics")
+    - Returns empty tuple if None (means "all metrics")
     """
     if not raw:
-        return []
-    parts = [p.strip() for p in raw.split(",")]
-    return _dedupe_preserve_order([p for p in parts if p])
+        return ()
+    return _split_unique(raw)
 
 
+@lru_cache(maxsize=512)
 def parse_stat(raw: str | None) -> Statistic:
     """Normalize a statistic alias into a Statistic enum.
 
@@ -55,23 +74,33 @@ def parse_stat(raw: str | None) -> Statistic:
     Raises ValidationException on invalid input.
     """
     stat_norm = (raw or "average").strip().lower()
-    stat_map = {
-        "average": Statistic.AVG,
-        "min": Statistic.MIN,
-        "max": Statistic.MAX,
-        "sum": Statistic.SUM,
-    }
     try:
-        return stat_map[stat_norm]
+        return _STAT_ALIASES[stat_norm]
     except KeyError as e:
         raise ValidationException("Invalid 'stat' value. Use one of: average, min, max, sum") from e
 
 
+@lru_cache(maxsize=512)
+def parse_stats(raw: str | None) -> tuple[Statistic, ...]:
+    """Parse a comma-separated statistic list into de-duplicated Statistic enums.
+
+    Each entry is normalized like parse_stat; defaults to (average,) when None/empty.
+    Raises ValidationException if any entry is invalid or the list has no entries.
+    """
+    if not raw:
+        return (Statistic.AVG,)
+    parts = _split_unique(raw.lower())
+    if not parts:
+        return (parse_stat(raw),)
+    return tuple(dict.fromkeys(parse_stat(part) for part in parts))
+
+
 def compute_date_range_from_days(days: int | None, *, now: datetime | None = None) -> tuple[datetime, datetime]:
     """Compute [start, end] UTC range given a days-back integer.
 
     - Valid range: 1..31; default: exactly 1 day when None
     - Returns timezone-aware datetimes in UTC
+    - Reuses the same window for calls within the same second unless `now` is given
     - Raises ValidationException if out of range
     """
     if days is not None:
@@ -81,7 +110,31 @@ def compute_date_range_from_days(days: int | None, *, now: datetime | None = Non
     else:
         days_back = 1
 
-    end = now or datetime.now(UTC)
+    if now is not None:
+        return now - timedelta(days=days_back), now
+
+    now_s = int(time.time())
+    cached = _date_range_cache.get(days_back)
+    if cached is not None and cached[0] == now_s:
+        return cached[1], cached[2]
 
+    end = datetime.now(UTC)
     start = end - timedelta(days=days_back)
+    _date_range_cache[days_back] = (now_s, start, end)
     return start, end
+
+
+@lru_cache(maxsize=512)
+def describe_param(values: tuple[str, ...] | None) -> str:
+    """Render a parsed list parameter for query_info; "all" when it was omitted."""
+    return ",".join(values) if values else "all"
+
+
+@lru_cache(maxsize=64)
+def format_date_range(start: datetime, end: datetime) -> str:
+    """Render a query window for query_info.
+
+    compute_date_range_from_days hands out the same datetimes within a second,
+    so the ISO formatting runs once per window rather than once per request.
+    """
+    return f"{start.isoformat()} to {end.isoformat()}"
@@ -4,6 +4,8 @@ from litestar.exceptions import ValidationException
 
 from sensor_api.data.models import MetricType, SensorIngestPayload
 
+_ALLOWED_METRICS: frozenset[str] = frozenset(m.value for m in MetricType.__members__.values())
+
 
 def validate_ingest_payload(sensor_id: str, payload: SensorIngestPayload) -> None:
     """Validate ingest request payload and path params.
@@ -22,11 +24,19 @@ def validate_ingest_payload(sensor_id: str, payload: SensorIngestPayload) -> Non
     if not isinstance(payload.location, str) or not payload.location.strip():
         raise ValidationException("'location' must be a non-empty string")
 
-    allowed_metrics = {m.value for m in MetricType.__members__.values()}
-    for name, value in payload.metrics.items():
-        if not isinstance(name, str) or not name.strip():
-            raise ValidationException("Metric names must be non-empty strings")
-        if name not in allowed_metrics:
-            raise ValidationException(f"Unknown metric '{name}'. See /api/v1/metrics for allowed values")
-        if not isinstance(value, (int, float)) or not math.isfinite(float(value)):
+    metrics = payload.metrics
+    # One subset check covers every name; only look for the offender when it fails
+    if not metrics.keys() <= _ALLOWED_METRICS:
+        for name in metrics:
+            if not isinstance(name, str) or not name.strip():
+                raise ValidationException("Metric names must be non-empty strings")
+            if name not in _ALLOWED_METRICS:
+                raise ValidationException(f"Unknown metric '{name}'. See /api/v1/metrics for allowed values")
+
+    for name, value in metrics.items():
+        value_type = type(value)
+        if value_type is float:
+            if not math.isfinite(value):
+                raise ValidationException(f"Metric '{name}' must be a finite number")
+        elif value_type is not int:
             raise ValidationException(f"Metric '{name}' must be a finite number")
@@ -3,9 +3,18 @@ from dotenv import load_dotenv
 # ruff: noqa: E402
 load_dotenv()
 
-from sensor_api.config.timescaledb import DATABASE_URL, DATABASE_URL_SYNC
+from sensor_api.config.timescaledb import (
+    DATABASE_URL,
+    DATABASE_URL_ASYNCPG,
+    DATABASE_URL_SYNC,
+    QUERY_CACHE_TTL,
+    USE_CONTINUOUS_AGGREGATES,
+)
 
 __all__ = [
     "DATABASE_URL",
+    "DATABASE_URL_ASYNCPG",
     "DATABASE_URL_SYNC",
+    "QUERY_CACHE_TTL",
+    "USE_CONTINUOUS_AGGREGATES",
 ]
@@ -6,3 +6,13 @@ if not DATABASE_CREDENTIALS:
 
 DATABASE_URL = f"postgresql+asyncpg://{DATABASE_CREDENTIALS}"
 DATABASE_URL_SYNC = f"postgresql+psycopg2://{DATABASE_CREDENTIALS}"
+DATABASE_URL_ASYNCPG = f"postgresql://{DATABASE_CREDENTIALS}"
+
+# Serve aggregate queries from the sensor_metrics_hourly continuous aggregate. Rollups of buckets that were
+# already materialized only pick up late (backfilled) rows after the next refresh policy run.
+USE_CONTINUOUS_AGGREGATES = os.getenv("USE_CONTINUOUS_AGGREGATES", "").lower() in ("1", "true", "yes")
+
+# Opt-in: seconds an aggregate may be reused for an identical request, including "last N days" windows that
+# slide with the clock. Ingests through this process invalidate cached results immediately, but deletes and
+# other writers stay invisible for up to the TTL. Disabled (0) by default.
+QUERY_CACHE_TTL = float(os.getenv("QUERY_CACHE_TTL", "0"))
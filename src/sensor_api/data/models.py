@@ -3,11 +3,23 @@ from enum import Enum
 from typing import Any
 
 import msgspec
-from sqlalchemy import Column, Float, Index, Text, func
+from sqlalchemy import Column, Float, Index, MetaData, Table, Text
 from sqlalchemy.dialects.postgresql import TIMESTAMP
-from sqlalchemy.orm import declarative_base
 
-Base = declarative_base()
+metadata = MetaData()
+
+# Column order used for bulk COPY into the sensor_metrics hypertable
+SENSOR_METRIC_COLUMNS = (
+    "timestamp",
+    "sensor_id",
+    "location",
+    "sensor_type",
+    "temperature",
+    "humidity",
+    "pressure",
+)
+
+SensorMetricRecord = tuple[datetime, str, str, str, float | None, float | None, float | None]
 
 
 class Statistic(str, Enum):
@@ -16,15 +28,6 @@ class Statistic(str, Enum):
     AVG = "average"
     SUM = "sum"
 
-    def to_sqlalchemy_func(self):
-        mapping = {
-            Statistic.MIN: func.min,
-            Statistic.MAX: func.max,
-            Statistic.SUM: func.sum,
-            Statistic.AVG: func.avg,
-        }
-        return mapping.get(self, func.avg)
-
 
 class MetricType(str, Enum):
     TEMPERATURE = "temperature"
@@ -32,37 +35,41 @@ class MetricType(str, Enum):
     PRESSURE = "pressure"
 
 
-class SensorMetric(Base):
-    """TimescaleDB hypertable for sensor metrics"""
-
-    __tablename__ = "sensor_metrics"
-
-    timestamp = Column(TIMESTAMP(timezone=True), primary_key=True, nullable=False)
-    sensor_id = Column(Text, primary_key=True, nullable=False)
-    location = Column("location", Text, nullable=False)
-    sensor_type = Column(Text, nullable=False)
-    temperature = Column("temperature", Float(precision=53), nullable=True)
-    humidity = Column("humidity", Float(precision=53), nullable=True)
-    pressure = Column("pressure", Float(precision=53), nullable=True)
-
-    __table_args__ = (Index("idx_sensor_metrics_sensor_time", "sensor_id", "timestamp"),)
-
-    @classmethod
-    def from_sensor_data(cls, data: "SensorData") -> "SensorMetric":
-        """Create TimescaleDB record from SensorData"""
-        metric_values = {
-            "temperature": data.metrics.get("temperature"),
-            "humidity": data.metrics.get("humidity"),
-            "pressure": data.metrics.get("pressure"),
-        }
-
-        return cls(
-            timestamp=data.timestamp,
-            sensor_id=data.sensor_id,
-            location=data.location,
-            sensor_type=data.sensor_type,
-            **metric_values,
-        )
+SensorMetric = Table(
+    "sensor_metrics",
+    metadata,
+    Column("timestamp", TIMESTAMP(timezone=True), primary_key=True, nullable=False),
+    Column("sensor_id", Text, primary_key=True, nullable=False),
+    Column("location", Text, nullable=False),
+    Column("sensor_type", Text, nullable=False),
+    Column("temperature", Float(precision=53), nullable=True),
+    Column("humidity", Float(precision=53), nullable=True),
+    Column("pressure", Float(precision=53), nullable=True),
+    Index("idx_sensor_metrics_sensor_time", "sensor_id", "timestamp"),
+)
+"""TimescaleDB hypertable for sensor metrics"""
+
+Sensor = Table(
+    "sensors",
+    metadata,
+    Column("sensor_id", Text, primary_key=True, nullable=False),
+)
+"""Registry of known sensor IDs, kept in step with sensor_metrics on ingest"""
+
+
+def _build_record(
+    timestamp: datetime | None, sensor_id: str, location: str, sensor_type: str, metrics: dict[str, float]
+) -> SensorMetricRecord:
+    """Build a sensor_metrics row tuple ordered as SENSOR_METRIC_COLUMNS, stamping rows without a timestamp"""
+    return (
+        timestamp or datetime.now(UTC),
+        sensor_id,
+        location,
+        sensor_type,
+        metrics.get("temperature"),
+        metrics.get("humidity"),
+        metrics.get("pressure"),
+    )
 
 
 class SensorData(msgspec.Struct):
@@ -78,9 +85,9 @@ class SensorData(msgspec.Struct):
         if self.timestamp is None:
             object.__setattr__(self, "timestamp", datetime.now(UTC))
 
-    def to_db_record(self) -> SensorMetric:
-        """Convert to single TimescaleDB record"""
-        return SensorMetric.from_sensor_data(self)
+    def to_record(self) -> SensorMetricRecord:
+        """Convert to a row tuple ordered as SENSOR_METRIC_COLUMNS"""
+        return _build_record(self.timestamp, self.sensor_id, self.location, self.sensor_type, self.metrics)
 
 
 class SensorIngestPayload(msgspec.Struct):
@@ -91,13 +98,17 @@ class SensorIngestPayload(msgspec.Struct):
     metrics: dict[str, float]
     timestamp: datetime | None = None
 
+    def to_record(self, sensor_id: str) -> SensorMetricRecord:
+        """Convert straight to a row tuple ordered as SENSOR_METRIC_COLUMNS"""
+        return _build_record(self.timestamp, sensor_id, self.location, self.sensor_type, self.metrics)
+
 
 class SensorQuery(msgspec.Struct):
     """Query parameters for sensor data"""
 
-    sensor_ids: list[str] | None = None
-    metrics: list[str] = msgspec.field(default_factory=list)
-    statistic: Statistic = Statistic.AVG
+    sensor_ids: tuple[str, ...] | None = None
+    metrics: tuple[str, ...] = ()
+    statistics: tuple[Statistic, ...] = (Statistic.AVG,)
     start_date: datetime | None = None
     end_date: datetime | None = None
 
@@ -129,3 +140,19 @@ class SensorQueryResponse(msgspec.Struct):
     results: list[SensorQueryResult]
     query_info: dict[str, Any]
     message: str = "Success"
+
+
+class SensorReading(msgspec.Struct):
+    """A single stored row; metrics omits columns that were not recorded"""
+
+    timestamp: datetime
+    metrics: dict[str, float]
+
+
+class SensorReadingsResponse(msgspec.Struct):
+    """Raw readings query response; truncated is set when more rows matched than were returned"""
+
+    results: list[SensorReading]
+    query_info: dict[str, Any]
+    truncated: bool = False
+    message: str = "Success"
@@ -15,6 +15,7 @@ async def lifespan(app: Litestar):
     global storage
 
     storage = TimescaleDBHandler()
+    await storage.start()
     app.state.storage = storage
 
     yield
@@ -1,101 +1,376 @@
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Callable
 from contextlib import asynccontextmanager
+from datetime import UTC, datetime, timedelta
+from itertools import permutations
+from typing import cast
 
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+import asyncpg
+from sqlalchemy.ext.asyncio import create_async_engine
 
-from sensor_api.config import DATABASE_URL
+from sensor_api.config import DATABASE_URL, DATABASE_URL_ASYNCPG, QUERY_CACHE_TTL, USE_CONTINUOUS_AGGREGATES
 from sensor_api.data.models import (
+    SENSOR_METRIC_COLUMNS,
     MetricResult,
     MetricType,
     SensorData,
-    SensorMetric,
+    SensorMetricRecord,
     SensorQuery,
     SensorQueryResult,
+    SensorReading,
+    Statistic,
 )
 
+_METRIC_NAMES = tuple(m.value for m in MetricType.__members__.values())
+
+_AGGREGATE_FUNCS = {
+    Statistic.MIN: "min",
+    Statistic.MAX: "max",
+    Statistic.SUM: "sum",
+    Statistic.AVG: "avg",
+}
+
+# (statistics, ordered metrics, sensor filter) identifying one query template
+_SqlKey = tuple[tuple[Statistic, ...], tuple[str, ...], bool]
+
+
+def _build_aggregate_sql(statistics: tuple[Statistic, ...], metrics: tuple[str, ...], filter_sensors: bool) -> str:
+    """Build the per-sensor aggregate query; $1/$2 bound the time range, $3 is the sensor id array.
+
+    Value columns are ordered statistic-major: every metric for the first statistic, then the next.
+    """
+    columns = ", ".join(f"{_AGGREGATE_FUNCS[statistic]}({m})" for statistic in statistics for m in metrics)
+    sensor_filter = " AND sensor_id = ANY($3::text[])" if filter_sensors else ""
+    # Interpolated identifiers come from the Statistic/MetricType enums, never from request input
+    return (
+        f"SELECT sensor_id, {columns} FROM sensor_metrics "  # nosec B608
+        f"WHERE timestamp >= $1 AND timestamp <= $2{sensor_filter} GROUP BY sensor_id"
+    )
+
+
+# Every single-statistic (statistic, ordered metrics, sensor filter) query is built once at import time, so
+# requests never compile SQL and asyncpg's per-connection statement cache prepares each one only once.
+# Multi-statistic queries are built on first use and kept alongside them.
+_AGGREGATE_SQL: dict[_SqlKey, str] = {
+    ((statistic,), metrics, filter_sensors): _build_aggregate_sql((statistic,), metrics, filter_sensors)
+    for statistic in Statistic.__members__.values()
+    for size in range(1, len(_METRIC_NAMES) + 1)
+    for metrics in permutations(_METRIC_NAMES, size)
+    for filter_sensors in (False, True)
+}
+
+
+def _build_rollup_sql(statistics: tuple[Statistic, ...], metrics: tuple[str, ...], filter_sensors: bool) -> str:
+    """Build the aggregate query that combines hourly rollups with raw rows at the window edges.
+
+    $1/$2 bound the full time range, $3/$4 the whole-hour span served from sensor_metrics_hourly,
+    $5 is the sensor id array. Each part yields per-sensor partials that are combined by the outer query;
+    averages are carried as sum/count pairs so they stay exact. Value columns are statistic-major.
+    """
+    rollup_cols: list[str] = []
+    raw_cols: list[str] = []
+    outer_cols: list[str] = []
+    for statistic in statistics:
+        for m in metrics:
+            p = len(rollup_cols)
+            if statistic is Statistic.AVG:
+                rollup_cols += [f"{m}_sum", f"{m}_count"]
+                raw_cols += [f"sum({m})", f"count({m})"]
+                outer_cols.append(f"sum(p{p}) / nullif(sum(p{p + 1}), 0)")
+            else:
+                agg = _AGGREGATE_FUNCS[statistic]
+                rollup_cols.append(f"{m}_{agg}")
+                raw_cols.append(f"{agg}({m})")
+                outer_cols.append(f"{agg}(p{p})")
+    aliases = [f"p{i}" for i in range(len(rollup_cols))]
+
+    sensor_filter = " AND sensor_id = ANY($5::text[])" if filter_sensors else ""
+    raw = ", ".join(raw_cols)
+    # Interpolated identifiers come from the Statistic/MetricType enums, never from request input
+    return (
+        f"SELECT sensor_id, {', '.join(outer_cols)} FROM ("  # nosec B608
+        f"SELECT sensor_id, {', '.join(rollup_cols)} FROM sensor_metrics_hourly "
+        f"WHERE bucket >= $3 AND bucket < $4{sensor_filter} "
+        f"UNION ALL SELECT sensor_id, {raw} FROM sensor_metrics "
+        f"WHERE timestamp >= $1 AND timestamp < $3{sensor_filter} GROUP BY sensor_id "
+        f"UNION ALL SELECT sensor_id, {raw} FROM sensor_metrics "
+        f"WHERE timestamp >= $4 AND timestamp <= $2{sensor_filter} GROUP BY sensor_id"
+        f") AS parts ({', '.join(['sensor_id', *aliases])}) GROUP BY sensor_id"
+    )
+
+
+_ROLLUP_SQL: dict[_SqlKey, str] = {
+    ((statistic,), metrics, filter_sensors): _build_rollup_sql((statistic,), metrics, filter_sensors)
+    for statistic in Statistic.__members__.values()
+    for size in range(1, len(_METRIC_NAMES) + 1)
+    for metrics in permutations(_METRIC_NAMES, size)
+    for filter_sensors in (False, True)
+}
+
+
+def _lookup_sql(templates: dict[_SqlKey, str], build: Callable[..., str], key: _SqlKey) -> str:
+    """Return the prebuilt query for key, building and keeping it on first use for multi-statistic keys"""
+    sql = templates.get(key)
+    if sql is None:
+        sql = templates[key] = build(*key)
+    return sql
+
+
+# One sensor's rows in a time range, oldest first; $4 caps the row count
+_READINGS_SQL = (
+    f"SELECT timestamp, {', '.join(_METRIC_NAMES)} FROM sensor_metrics "  # nosec B608
+    "WHERE sensor_id = $1 AND timestamp >= $2 AND timestamp <= $3 ORDER BY timestamp LIMIT $4"
+)
+
+# Registers the sensors seen in a batch; ids are sorted so concurrent writers lock in the same order
+_REGISTER_SENSORS_SQL = "INSERT INTO sensors (sensor_id) SELECT unnest($1::text[]) ON CONFLICT DO NOTHING"
+
+# asyncpg pool serving the ingest and query hot paths
+ASYNCPG_POOL_MIN_SIZE = 8
+ASYNCPG_POOL_MAX_SIZE = 64
+STATEMENT_CACHE_SIZE = 1024
+
+# Ingest batching: flush as soon as the queue runs dry, up to this many rows per batch.
+# Rows that arrive during a COPY queue up and form the next batch.
+INGEST_BATCH_SIZE = 1000
+# Most rows waiting for the writer; ingest requests wait for room beyond this
+INGEST_QUEUE_SIZE = 10 * INGEST_BATCH_SIZE
+
+# Query results kept for reuse (see QUERY_CACHE_TTL)
+QUERY_CACHE_SIZE = 1024
+
+# Most rows returned by a single raw readings query
+READINGS_LIMIT = 10_000
+
 
 class TimescaleDBHandler:
-    def __init__(self):
+    def __init__(
+        self,
+        batch_size: int = INGEST_BATCH_SIZE,
+        use_rollups: bool = USE_CONTINUOUS_AGGREGATES,
+        query_cache_ttl: float = QUERY_CACHE_TTL,
+    ):
+        # Only a fallback for get_raw_connection() before start() opens the asyncpg pool, so it is left untuned
         self.async_engine = create_async_engine(DATABASE_URL)
-        self.async_session = async_sessionmaker(
-            self.async_engine, class_=AsyncSession, expire_on_commit=False
+        self.batch_size = batch_size
+        self.use_rollups = use_rollups
+        self._ingest_queue: asyncio.Queue[tuple[SensorMetricRecord, asyncio.Future[None]] | None] = asyncio.Queue(
+            INGEST_QUEUE_SIZE
         )
+        self._ingest_task: asyncio.Task[None] | None = None
+        self.pool: asyncpg.Pool | None = None
+        self.query_cache_ttl = query_cache_ttl
+        # key -> (monotonic time stored, ingest generation, per-sensor metric rows)
+        self._query_cache: OrderedDict[tuple, tuple[float, int, list[tuple[str, list[MetricResult]]]]] = OrderedDict()
+        # Bumped after every committed ingest so cached results never hide this process's own writes
+        self._ingest_generation = 0
+
+    async def start(self) -> None:
+        """Open the asyncpg pool and start the background ingest writer"""
+        if self.pool is None:
+            self.pool = await asyncpg.create_pool(
+                DATABASE_URL_ASYNCPG,
+                min_size=ASYNCPG_POOL_MIN_SIZE,
+                max_size=ASYNCPG_POOL_MAX_SIZE,
+                statement_cache_size=STATEMENT_CACHE_SIZE,
+            )
+        if self._ingest_task is None:
+            self._ingest_task = asyncio.create_task(self._ingest_loop())
 
     @asynccontextmanager
-    async def get_session(self):
-        """Get async database session"""
-        session = self.async_session()
-        try:
-            yield session
-        finally:
-            await session.close()
+    async def get_raw_connection(self) -> AsyncIterator[asyncpg.Connection]:
+        """Get an asyncpg connection, from the asyncpg pool once started, else from the engine pool"""
+        if self.pool is not None:
+            async with self.pool.acquire() as conn:
+                yield cast(asyncpg.Connection, conn)
+            return
+
+        async with self.async_engine.connect() as conn:
+            raw = await conn.get_raw_connection()
+            yield cast(asyncpg.Connection, raw.driver_connection)
 
     async def store_sensor_data(self, data: SensorData) -> None:
         """Store sensor data in TimescaleDB"""
-        async with self.get_session() as session:
-            db_record = data.to_db_record()
-            session.add(db_record)
-            await session.commit()
+        await self.store_record(data.to_record())
+
+    async def store_record(self, record: SensorMetricRecord) -> None:
+        """Store a single sensor_metrics row tuple.
+
+        Rows are queued for the background writer, which flushes them in batches;
+        this waits until the batch containing the row has been written.
+        """
+        if self._ingest_task is None:
+            await self._copy_records([record])
+        else:
+            future = asyncio.get_running_loop().create_future()
+            await self._ingest_queue.put((record, future))
+            await future
+        self._ingest_generation += 1
+
+    async def _ingest_loop(self) -> None:
+        """Drain the ingest queue into batches until the stop sentinel is received"""
+        queue = self._ingest_queue
+        stopping = False
+        while not stopping:
+            item = await queue.get()
+            if item is None:
+                break
+            batch = [item]
+            while len(batch) < self.batch_size:
+                try:
+                    item = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._flush_batch(batch)
+
+    async def _flush_batch(self, batch: list[tuple[SensorMetricRecord, asyncio.Future[None]]]) -> None:
+        """Write a batch with one COPY, falling back to per-row writes so one bad row fails alone"""
+        try:
+            await self._copy_records([record for record, _ in batch])
+        except Exception as e:
+            if len(batch) == 1:
+                _, future = batch[0]
+                if not future.done():
+                    future.set_exception(e)
+                return
+            for record, future in batch:
+                try:
+                    await self._copy_records([record])
+                except Exception as row_error:
+                    if not future.done():
+                        future.set_exception(row_error)
+                else:
+                    if not future.done():
+                        future.set_result(None)
+        else:
+            for _, future in batch:
+                if not future.done():
+                    future.set_result(None)
+
+    async def _copy_records(self, records: list[SensorMetricRecord]) -> None:
+        """Bulk insert row tuples with COPY and register their sensor IDs in one transaction"""
+        sensor_ids = sorted({record[1] for record in records})
+        async with self.get_raw_connection() as conn, conn.transaction():
+            await conn.copy_records_to_table("sensor_metrics", records=records, columns=SENSOR_METRIC_COLUMNS)
+            await conn.execute(_REGISTER_SENSORS_SQL, sensor_ids)
 
     async def query_sensor_data(self, query: SensorQuery) -> list[SensorQueryResult]:
         """Query sensor data from TimescaleDB with statistics"""
-        async with self.get_session() as session:
-            requested_metrics = query.metrics or [
-                m.value for m in MetricType.__members__.values()
-            ]
-            # Filter to only metrics that exist on SensorMetric once up-front
-            valid_metrics = [m for m in requested_metrics if hasattr(SensorMetric, m)]
-            if not valid_metrics:
-                return []
-
-            agg_func = query.statistic.to_sqlalchemy_func()
-
-            stmt = select(
-                SensorMetric.sensor_id,
-                *(
-                    agg_func(getattr(SensorMetric, m)).label(f"{m}_value")
-                    for m in valid_metrics
-                ),
-            ).group_by(SensorMetric.sensor_id)
-
-            if query.sensor_ids:
-                stmt = stmt.where(SensorMetric.sensor_id.in_(query.sensor_ids))
-
-            start_date, end_date = query.get_date_filter()
-            stmt = stmt.where(
-                SensorMetric.timestamp >= start_date,
-                SensorMetric.timestamp <= end_date,
-            )
+        requested_metrics = query.metrics or _METRIC_NAMES
+        # Drop unknown metrics and duplicates once up-front
+        valid_metrics = tuple(dict.fromkeys(m for m in requested_metrics if m in _METRIC_NAMES))
+        if not valid_metrics:
+            return []
+
+        start_date, end_date = query.get_date_filter()
+        filter_sensors = bool(query.sensor_ids)
+        statistics = query.statistics
+        key = (statistics, valid_metrics, filter_sensors)
+
+        cache_key = None
+        if self.query_cache_ttl > 0:
+            # Windows ending about now slide with the clock, so they are keyed on their length
+            if datetime.now(UTC) - end_date < timedelta(seconds=self.query_cache_ttl):
+                window: tuple = (end_date - start_date,)
+            else:
+                window = (start_date, end_date)
+            cache_key = (*key, query.sensor_ids, *window)
+            cached = self._query_cache.get(cache_key)
+            if (
+                cached is not None
+                and cached[1] == self._ingest_generation
+                and time.monotonic() - cached[0] < self.query_cache_ttl
+            ):
+                self._query_cache.move_to_end(cache_key)
+                # Only metric rows are cached; results are stamped with this request's window end
+                return [
+                    SensorQueryResult(sensor_id=sensor_id, metrics=metrics, timestamp=end_date)
+                    for sensor_id, metrics in cached[2]
+                ]
+        generation = self._ingest_generation
+
+        # Whole hours inside the window can be read from the hourly rollup
+        rollup_start = start_date.replace(minute=0, second=0, microsecond=0)
+        if rollup_start < start_date:
+            rollup_start += timedelta(hours=1)
+        rollup_end = end_date.replace(minute=0, second=0, microsecond=0)
+
+        if self.use_rollups and rollup_start < rollup_end:
+            sql = _lookup_sql(_ROLLUP_SQL, _build_rollup_sql, key)
+            args: list[object] = [start_date, end_date, rollup_start, rollup_end]
+        else:
+            sql = _lookup_sql(_AGGREGATE_SQL, _build_aggregate_sql, key)
+            args = [start_date, end_date]
+        if filter_sensors:
+            args.append(list(query.sensor_ids or ()))
+
+        async with self.get_raw_connection() as conn:
+            rows = await conn.fetch(sql, *args)
 
-            rows = (await session.execute(stmt)).fetchall()
-
-            sensor_results = [
-                SensorQueryResult(
-                    sensor_id=row.sensor_id,
-                    metrics=[
-                        MetricResult(
-                            metric=m,
-                            value=float(getattr(row, f"{m}_value")),
-                            statistic=query.statistic.value,
-                        )
-                        for m in valid_metrics
-                        if getattr(row, f"{m}_value", None) is not None
-                    ],
-                    timestamp=end_date,
-                )
-                for row in rows
+        # Value columns follow sensor_id, statistic-major in valid_metrics order
+        columns = tuple(enumerate(((m, statistic.value) for statistic in statistics for m in valid_metrics), start=1))
+        sensor_rows: list[tuple[str, list[MetricResult]]] = []
+        for row in rows:
+            metrics = [
+                MetricResult(metric=m, value=value, statistic=statistic)
+                for i, (m, statistic) in columns
+                if (value := row[i]) is not None
             ]
+            if metrics:
+                sensor_rows.append((row[0], metrics))
 
-            return [r for r in sensor_results if r.metrics]
+        if cache_key is not None:
+            self._query_cache[cache_key] = (time.monotonic(), generation, sensor_rows)
+            self._query_cache.move_to_end(cache_key)
+            if len(self._query_cache) > QUERY_CACHE_SIZE:
+                self._query_cache.popitem(last=False)
+
+        return [
+            SensorQueryResult(sensor_id=sensor_id, metrics=metrics, timestamp=end_date)
+            for sensor_id, metrics in sensor_rows
+        ]
+
+    async def query_sensor_readings(
+        self, sensor_id: str, metrics: tuple[str, ...], start_date: datetime, end_date: datetime
+    ) -> tuple[list[SensorReading], bool]:
+        """Return one sensor's stored rows in the range, oldest first, and whether READINGS_LIMIT cut them short"""
+        wanted = frozenset(metrics or _METRIC_NAMES)
+        # Column positions after timestamp for the requested metrics
+        columns = tuple((i, m) for i, m in enumerate(_METRIC_NAMES, start=1) if m in wanted)
+
+        async with self.get_raw_connection() as conn:
+            # One row past the limit tells a full page apart from a truncated one
+            rows = await conn.fetch(_READINGS_SQL, sensor_id, start_date, end_date, READINGS_LIMIT + 1)
+        truncated = len(rows) > READINGS_LIMIT
+
+        readings = [
+            SensorReading(
+                timestamp=row[0],
+                metrics={m: value for i, m in columns if (value := row[i]) is not None},
+            )
+            for row in rows[:READINGS_LIMIT]
+        ]
+        return readings, truncated
 
     async def close(self):
-        """Close database connections"""
+        """Flush pending ingests and close database connections"""
+        if self._ingest_task is not None:
+            await self._ingest_queue.put(None)
+            await self._ingest_task
+            self._ingest_task = None
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
         await self.async_engine.dispose()
 
     async def list_sensor_ids(self) -> list[str]:
         """Return distinct sensor IDs seen"""
-        async with self.get_session() as session:
-            stmt = select(SensorMetric.sensor_id).distinct()
-            result = await session.execute(stmt)
-            rows = result.scalars().all()
-            return sorted(set(rows))
+        async with self.get_raw_connection() as conn:
+            rows = await conn.fetch("SELECT sensor_id FROM sensors")
+        return sorted(row[0] for row in rows)
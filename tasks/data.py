@@ -1,40 +1,55 @@
 import asyncio
 import contextlib
-import random
+from collections.abc import Iterable, Iterator
 from datetime import UTC, datetime, timedelta
+from itertools import batched
 
 import aiohttp
+import msgspec
+import numpy as np
 from invoke.collection import Collection
 from invoke.tasks import task
 
 from sensor_api.data.models import MetricType
 
+_METRIC_KEYS = tuple(m.value for m in MetricType.__members__.values())
 
-def generate_data() -> dict:
-    """Generate simple numeric metrics."""
-    keys = [m.value for m in MetricType.__members__.values()]
-    return {key: round(random.uniform(0, 100), 2) for key in keys}
+_rng = np.random.default_rng()
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Hours of timestamps rendered per numpy call in iter_messages
+_HOURS_PER_BLOCK = 4096
+
+
+def generate_data(count: int) -> list[dict[str, float]]:
+    """Generate simple numeric metrics for `count` messages in one vectorized draw."""
+    values = _rng.uniform(0, 100, size=(count, len(_METRIC_KEYS))).round(2).tolist()
+    return [dict(zip(_METRIC_KEYS, row, strict=True)) for row in values]
 
 
 async def send_sensor_data(
     session: aiohttp.ClientSession,
     sensor_id: str,
-    timestamp: datetime,
+    timestamp: str,
     api_url: str,
     location: str,
     sensor_type: str,
+    metrics: dict[str, float],
 ) -> bool:
     """Send sensor data to the API."""
-    metrics = generate_data()
-
     payload = {
         "location": location,
         "sensor_type": sensor_type,
         "metrics": metrics,
-        "timestamp": timestamp.isoformat(),
+        "timestamp": timestamp,
     }
 
-    async with session.post(f"{api_url}/api/v1/sensors/{sensor_id}/data", json=payload) as response:
+    async with session.post(
+        f"{api_url}/api/v1/sensors/{sensor_id}/data",
+        data=msgspec.json.encode(payload),
+        headers=_JSON_HEADERS,
+    ) as response:
         if response.status >= 400:
             with contextlib.suppress(Exception):
                 await response.text()
@@ -42,31 +57,54 @@ async def send_sensor_data(
         return True
 
 
-async def send_all_data_concurrently(tasks_batch: list, api_url: str, semaphore: asyncio.Semaphore) -> list[bool]:
-    """Send sensor data concurrently with a single session and semaphore control."""
+async def send_all_data_concurrently(messages: Iterable[tuple], api_url: str, max_workers: int) -> int:
+    """Stream messages through a bounded queue to a fixed pool of sender workers.
+
+    Returns the number of messages the API accepted.
+    """
     timeout = aiohttp.ClientTimeout(total=30)
-    async with aiohttp.ClientSession(timeout=timeout) as session:
-
-        async def send_with_semaphore(sensor_id, timestamp, location, sensor_type):
-            async with semaphore:
-                return await send_sensor_data(
-                    session,
-                    sensor_id,
-                    timestamp,
-                    api_url,
-                    location,
-                    sensor_type,
-                )
-
-        results = await asyncio.gather(
-            *[
-                send_with_semaphore(sensor_id, timestamp, location, sensor_type)
-                for sensor_id, timestamp, location, sensor_type in tasks_batch
-            ],
-            return_exceptions=True,
-        )
-
-        return [result if isinstance(result, bool) else False for result in results]
+    connector = aiohttp.TCPConnector(limit=max_workers, ttl_dns_cache=300)
+    queue: asyncio.Queue[tuple | None] = asyncio.Queue(maxsize=max_workers * 4)
+    sent = 0
+
+    async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+
+        async def worker():
+            nonlocal sent
+            while (item := await queue.get()) is not None:
+                sensor_id, timestamp, location, sensor_type, metrics = item
+                with contextlib.suppress(Exception):
+                    if await send_sensor_data(session, sensor_id, timestamp, api_url, location, sensor_type, metrics):
+                        sent += 1
+
+        workers = [asyncio.create_task(worker()) for _ in range(max_workers)]
+        for chunk in batched(messages, queue.maxsize, strict=False):
+            for message, metrics in zip(chunk, generate_data(len(chunk)), strict=True):
+                await queue.put((*message, metrics))
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+
+    return sent
+
+
+def iter_messages(
+    sensor_ids: list[str], profiles: dict[str, tuple[str, str]], start_time: datetime, end_time: datetime
+) -> Iterator[tuple[str, str, str, str]]:
+    """Yield one (sensor_id, timestamp, location, sensor_type) per sensor per hour.
+
+    Hourly timestamps are computed and ISO-formatted with numpy a block at a time,
+    so the Python loop only walks the already-rendered strings.
+    """
+    hours = int((end_time - start_time).total_seconds() // 3600) + 1
+    start = np.datetime64(start_time.astimezone(UTC).replace(tzinfo=None), "us")
+    sensors = [(sensor_id, *profiles[sensor_id]) for sensor_id in sensor_ids]
+    for block_start in range(0, hours, _HOURS_PER_BLOCK):
+        offsets = np.arange(block_start, min(block_start + _HOURS_PER_BLOCK, hours))
+        timestamps = np.datetime_as_string(start + offsets * np.timedelta64(1, "h"), unit="us", timezone="UTC")
+        for timestamp in timestamps.tolist():
+            for sensor_id, location, stype in sensors:
+                yield sensor_id, timestamp, location, stype
 
 
 async def _run_generation(sensors: int, years: int, api_url: str, max_workers: int):
@@ -84,18 +122,8 @@ async def _run_generation(sensors: int, years: int, api_url: str, max_workers: i
     end_time = datetime.now(UTC)
     start_time = end_time - timedelta(days=365 * years_count)
 
-    tasks = []
-    current_time = start_time
-    while current_time <= end_time:
-        for sensor_id in sensor_ids:
-            location, stype = profiles[sensor_id]
-            tasks.append((sensor_id, current_time, location, stype))
-        current_time += timedelta(hours=1)
-
-    semaphore = asyncio.Semaphore(max_workers_count)
-    results = await send_all_data_concurrently(tasks, api_url, semaphore)
-
-    sum(results)
+    messages = iter_messages(sensor_ids, profiles, start_time, end_time)
+    await send_all_data_concurrently(messages, api_url, max_workers_count)
 
 
 @task
@@ -3,9 +3,9 @@ from invoke.tasks import task
 
 
 @task
-def test_all(ctx):
-    """Run all tests."""
-    ctx.run("pytest tests/")
+def test_all(ctx, workers=4):
+    """Run all tests, spread over this many xdist workers (0 runs them in-process)."""
+    ctx.run(f"pytest tests/ -n {workers} --dist loadgroup")
 
 
 test_ns = Collection("test", test_all=test_all)
@@ -1,13 +1,57 @@
 import asyncio
+import inspect
 
 import pytest
 
+pytest_plugins = "pytest_asyncio"
 
-@pytest.fixture(scope="session")
-def event_loop():
-    loop = asyncio.new_event_loop()
-    yield loop
-    loop.close()
+# Keep detailed assertion messages for the asserts inside the shared test helpers
+pytest.register_assert_rewrite("tests.helpers")
 
+TEST_SENSORS = ("sensor_001", "sensor_002", "test_ingest", "test_rollup")
 
-pytest_plugins = "pytest_asyncio"
+
+def pytest_collection_modifyitems(items):
+    """Run every async test on the session loop so it can share session-scoped async fixtures."""
+    session_loop = pytest.mark.asyncio(loop_scope="session")
+    for item in items:
+        if inspect.iscoroutinefunction(getattr(item, "function", None)):
+            item.add_marker(session_loop, append=False)
+
+
+async def _cleanup_test_data() -> None:
+    import asyncpg
+
+    from sensor_api.config import DATABASE_URL_ASYNCPG
+
+    # One plain connection is all teardown needs; no engine or pool to build and dispose
+    conn = await asyncpg.connect(DATABASE_URL_ASYNCPG)
+    try:
+        async with conn.transaction():
+            # The time bound lets TimescaleDB skip chunks older than any test row
+            await conn.execute(
+                "DELETE FROM sensor_metrics "
+                "WHERE sensor_id = ANY($1::text[]) AND timestamp >= now() - interval '11 days'",
+                TEST_SENSORS,
+            )
+            # Older rows for these ids (e.g. from data.generate) survive the time bound, so keep their sensors
+            await conn.execute(
+                "DELETE FROM sensors WHERE sensor_id = ANY($1::text[]) AND NOT EXISTS "
+                "(SELECT 1 FROM sensor_metrics m WHERE m.sensor_id = sensors.sensor_id)",
+                TEST_SENSORS,
+            )
+    finally:
+        await conn.close()
+
+
+def pytest_sessionfinish(session):
+    """Remove test rows once, from the controller, after every xdist worker has finished."""
+    if hasattr(session.config, "workerinput") or session.config.option.collectonly or not session.testscollected:
+        return
+    try:
+        asyncio.run(_cleanup_test_data())
+    except Exception as exc:
+        reporter = session.config.pluginmanager.get_plugin("terminalreporter")
+        if reporter is not None:
+            reporter.write_line(f"test data cleanup failed: {exc!r}", red=True)
+        session.exitstatus = pytest.ExitCode.TESTS_FAILED
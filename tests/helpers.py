@@ -0,0 +1,18 @@
+import aiohttp
+import orjson
+
+
+async def get_json(session: aiohttp.ClientSession, url: str) -> tuple[int, dict]:
+    """GET url and decode the body with orjson, releasing the connection as soon as it is read."""
+    response = await session.get(url, allow_redirects=False)
+    try:
+        return response.status, orjson.loads(await response.read())
+    finally:
+        response.release()
+
+
+async def get_metrics(session: aiohttp.ClientSession, url: str) -> tuple[dict, dict[str, dict]]:
+    """GET a query url expecting 200; return the body and the first result's metrics keyed by name."""
+    status, data = await get_json(session, url)
+    assert status == 200
+    return data, {m["metric"]: m for m in data["results"][0]["metrics"]}
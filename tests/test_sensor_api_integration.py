@@ -1,356 +1,424 @@
+import asyncio
+import math
+import os
+import statistics
 from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+from typing import Any
 
 import aiohttp
+import orjson
 import pytest
 import pytest_asyncio
-from dotenv import load_dotenv
 
+from .helpers import get_json, get_metrics
 
-@pytest.fixture(scope="session", autouse=True)
-def load_env():
-    load_dotenv()
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Client-side equivalents of the server's statistics, applied to raw readings
+_STAT_FUNCS = {"min": min, "max": max, "sum": math.fsum, "average": statistics.fmean}
+
+# Query paths, built once at import and appended to api_url
+URLS = {
+    "sensor_001_10d": "/api/v1/sensors/sensor_001/data?metrics=temperature,humidity&days=10",
+    "sensor_001_raw_10d": "/api/v1/sensors/sensor_001/data/raw?metrics=temperature,humidity&days=10",
+    "sensor_001_avg_10d": "/api/v1/sensors/sensor_001/data?metrics=temperature,humidity&stat=average&days=10",
+    "sensor_001_avg_7d": "/api/v1/sensors/sensor_001/data?metrics=temperature,humidity&stat=average&days=7",
+    "sensor_001_temp_avg_2d": "/api/v1/sensors/sensor_001/data?metrics=temperature&stat=average&days=2",
+    "sensor_001_temp_defaults": "/api/v1/sensors/sensor_001/data?metrics=temperature",
+    "sensor_001_all_metrics_avg_10d": "/api/v1/sensors/sensor_001/data?stat=average&days=10",
+    "multi_temp_avg_10d": "/api/v1/sensors/data?sensors=sensor_001,sensor_002&metrics=temperature&stat=average&days=10",
+    "all_sensors_temp_avg_10d": "/api/v1/sensors/data?metrics=temperature&stat=average&days=10",
+    "all_defaults": "/api/v1/sensors/data",
+}
 
 
 @pytest.fixture(scope="session")
 def api_url() -> str:
-    return "http://localhost:8000"
+    return os.getenv("SENSOR_API_URL", "http://localhost:8000")
 
 
-@pytest_asyncio.fixture
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
 async def http_session():
-    """HTTP session for making requests."""
+    """HTTP session shared by all tests so keep-alive connections are reused."""
     timeout = aiohttp.ClientTimeout(total=30)
-    session = aiohttp.ClientSession(timeout=timeout)
+    connector = aiohttp.TCPConnector(limit=100, keepalive_timeout=60)
+    # Every payload in this suite is a small JSON body, so compressing it costs more than it saves
+    session = aiohttp.ClientSession(
+        timeout=timeout,
+        connector=connector,
+        headers={"Accept-Encoding": "identity"},
+    )
     yield session
     await session.close()
 
 
-@pytest_asyncio.fixture(scope="session")
-async def test_data_setup(api_url):
-    timeout = aiohttp.ClientTimeout(total=30)
-    async with aiohttp.ClientSession(timeout=timeout) as session:
-        now = datetime.now(UTC)
-        base_time = now - timedelta(days=10)
-
-        test_data = [
-            {
-                "sensor_id": "sensor_001",
-                "timestamp": base_time + timedelta(days=1, hours=0),
-                "metrics": {"temperature": 100.0, "humidity": 10.0},
-                "location": "location_1",
-                "sensor_type": "sensor_type_1",
-            },
-            {
-                "sensor_id": "sensor_001",
-                "timestamp": base_time + timedelta(days=1, hours=12),
-                "metrics": {"temperature": 200.0, "humidity": 20.0},
-                "location": "location_1",
-                "sensor_type": "sensor_type_1",
-            },
-            {
-                "sensor_id": "sensor_001",
-                "timestamp": base_time + timedelta(days=2, hours=0),
-                "metrics": {"temperature": 300.0, "humidity": 30.0},
-                "location": "location_1",
-                "sensor_type": "sensor_type_1",
-            },
-            {
-                "sensor_id": "sensor_001",
-                "timestamp": base_time + timedelta(days=2, hours=12),
-                "metrics": {"temperature": 400.0, "humidity": 40.0},
-                "location": "location_1",
-                "sensor_type": "sensor_type_1",
-            },
-            {
-                "sensor_id": "sensor_002",
-                "timestamp": base_time + timedelta(days=1, hours=0),
-                "metrics": {"temperature": 500.0, "humidity": 50.0, "pressure": 1000.0},
-                "location": "location_2",
-                "sensor_type": "sensor_type_2",
-            },
-            {
-                "sensor_id": "sensor_002",
-                "timestamp": base_time + timedelta(days=1, hours=12),
-                "metrics": {"temperature": 600.0, "humidity": 60.0, "pressure": 2000.0},
-                "location": "location_2",
-                "sensor_type": "sensor_type_2",
+async def _seed_test_data(session: aiohttp.ClientSession, api_url: str, clock: SimpleNamespace) -> None:
+    now = clock.now
+    base_time = clock.base
+
+    test_data: list[dict[str, Any]] = [
+        {
+            "sensor_id": "sensor_001",
+            "timestamp": (base_time + timedelta(days=1, hours=0)).isoformat(),
+            "metrics": {"temperature": 100.0, "humidity": 10.0},
+            "location": "location_1",
+            "sensor_type": "sensor_type_1",
+        },
+        {
+            "sensor_id": "sensor_001",
+            "timestamp": (base_time + timedelta(days=1, hours=12)).isoformat(),
+            "metrics": {"temperature": 200.0, "humidity": 20.0},
+            "location": "location_1",
+            "sensor_type": "sensor_type_1",
+        },
+        {
+            "sensor_id": "sensor_001",
+            "timestamp": (base_time + timedelta(days=2, hours=0)).isoformat(),
+            "metrics": {"temperature": 300.0, "humidity": 30.0},
+            "location": "location_1",
+            "sensor_type": "sensor_type_1",
+        },
+        {
+            "sensor_id": "sensor_001",
+            "timestamp": (base_time + timedelta(days=2, hours=12)).isoformat(),
+            "metrics": {"temperature": 400.0, "humidity": 40.0},
+            "location": "location_1",
+            "sensor_type": "sensor_type_1",
+        },
+        {
+            "sensor_id": "sensor_002",
+            "timestamp": (base_time + timedelta(days=1, hours=0)).isoformat(),
+            "metrics": {"temperature": 500.0, "humidity": 50.0, "pressure": 1000.0},
+            "location": "location_2",
+            "sensor_type": "sensor_type_2",
+        },
+        {
+            "sensor_id": "sensor_002",
+            "timestamp": (base_time + timedelta(days=1, hours=12)).isoformat(),
+            "metrics": {"temperature": 600.0, "humidity": 60.0, "pressure": 2000.0},
+            "location": "location_2",
+            "sensor_type": "sensor_type_2",
+        },
+        {
+            "sensor_id": "sensor_001",
+            "timestamp": (now - timedelta(hours=2)).isoformat(),
+            "metrics": {"temperature": 1000.0, "humidity": 100.0},
+            "location": "location_1",
+            "sensor_type": "sensor_type_1",
+        },
+        {
+            "sensor_id": "sensor_002",
+            "timestamp": (now - timedelta(hours=4)).isoformat(),
+            "metrics": {
+                "temperature": 2000.0,
+                "humidity": 200.0,
+                "pressure": 3000.0,
             },
-            {
-                "sensor_id": "sensor_001",
-                "timestamp": now - timedelta(hours=2),
-                "metrics": {"temperature": 1000.0, "humidity": 100.0},
-                "location": "location_1",
-                "sensor_type": "sensor_type_1",
-            },
-            {
-                "sensor_id": "sensor_002",
-                "timestamp": now - timedelta(hours=4),
-                "metrics": {
-                    "temperature": 2000.0,
-                    "humidity": 200.0,
-                    "pressure": 3000.0,
-                },
-                "location": "location_2",
-                "sensor_type": "sensor_type_2",
-            },
-        ]
+            "location": "location_2",
+            "sensor_type": "sensor_type_2",
+        },
+    ]
 
-        for data in test_data:
-            sensor_id = data.pop("sensor_id")
-            if isinstance(data["timestamp"], datetime):
-                data["timestamp"] = data["timestamp"].isoformat()
-            async with session.post(f"{api_url}/api/v1/sensors/{sensor_id}/data", json=data) as response:
-                assert response.status == 201, f"Failed to load test data: {await response.text()}"
+    requests = [(data.pop("sensor_id"), orjson.dumps(data)) for data in test_data]
 
+    async def post(sensor_id: str, body: bytes) -> tuple[int, str]:
+        url = f"{api_url}/api/v1/sensors/{sensor_id}/data"
+        async with session.post(url, data=body, headers=_JSON_HEADERS) as response:
+            return response.status, await response.text()
 
-@pytest_asyncio.fixture(scope="session", autouse=True)
-async def cleanup_test_data():
-    yield
+    # Rows have distinct (timestamp, sensor_id) keys, so ingest order does not matter
+    for status, body in await asyncio.gather(*(post(sensor_id, body) for sensor_id, body in requests)):
+        assert status == 201, f"Failed to load test data: {body}"
 
-    from sqlalchemy import delete
 
-    from sensor_api.data.models import SensorMetric
-    from sensor_api.storage.timescaledb import TimescaleDBHandler
+@pytest.fixture(scope="session")
+def clock() -> SimpleNamespace:
+    """Single reference time for the run; base is the start of the seeded history."""
+    now = datetime.now(UTC)
+    return SimpleNamespace(now=now, base=now - timedelta(days=10))
 
-    storage = TimescaleDBHandler()
-    async with storage.get_session() as session:
-        test_sensors = ["sensor_001", "sensor_002", "test_ingest"]
-        stmt = delete(SensorMetric).where(SensorMetric.sensor_id.in_(test_sensors))
-        await session.execute(stmt)
-        await session.commit()
 
-    await storage.close()
+@pytest_asyncio.fixture(scope="session", autouse=True)
+async def warm_api(http_session, api_url):
+    """Fire one throwaway aggregate query so pool and chunk-metadata warmup is not billed to the first test."""
+    async with http_session.get(f"{api_url}/api/v1/sensors/data?days=1") as response:
+        await response.read()
 
 
-class TestSensorAPICore:
-    """Test core sensor API requirements with exact data and assertions."""
+@pytest_asyncio.fixture(scope="session")
+async def test_data_setup(http_session, api_url, clock, tmp_path_factory, warm_api):
+    """Seed the read-only query fixtures exactly once per run, even across xdist workers."""
+    # Set by xdist on its workers only, so this also covers runs without the plugin
+    if "PYTEST_XDIST_WORKER" not in os.environ:
+        await _seed_test_data(http_session, api_url, clock)
+        return
+
+    shared = tmp_path_factory.getbasetemp().parent
+    seeded = shared / "test_data_seeded"
+    failed = shared / "test_data_seed_failed"
+    try:
+        (shared / "test_data_seeding").touch(exist_ok=False)
+    except FileExistsError:
+        async with asyncio.timeout(30):
+            while not seeded.exists():
+                if failed.exists():
+                    pytest.fail("test data seeding failed on another worker")
+                await asyncio.sleep(0.05)
+        return
+
+    try:
+        await _seed_test_data(http_session, api_url, clock)
+    except BaseException:
+        failed.touch()
+        raise
+    seeded.touch()
 
-    @pytest.mark.asyncio
-    async def test_api_receives_new_metric_values(self, http_session: aiohttp.ClientSession, api_url: str):
-        """Test: The application can receive new metric values via API call."""
-        payload = {
-            "location": "location_3",
-            "sensor_type": "test_sensor",
-            "metrics": {"temperature": 100.0, "humidity": 200.0},
-            "timestamp": datetime.now(UTC).isoformat(),
-        }
 
-        async with http_session.post(f"{api_url}/api/v1/sensors/test_ingest/data", json=payload) as response:
-            assert response.status == 201
-            data = await response.json()
-            assert data["message"] == "Sensor data stored successfully"
-            assert data["sensor_id"] == "test_ingest"
+@pytest_asyncio.fixture(scope="session")
+async def sensor_001_stats(http_session, api_url, test_data_setup) -> dict[str | None, dict[str, dict]]:
+    """sensor_001 temperature/humidity over 10 days for every statistic, fetched once and shared.
 
-    @pytest.mark.asyncio
-    async def test_single_sensor_query(self, http_session: aiohttp.ClientSession, api_url: str, test_data_setup):
-        """Test: Query single sensor with known data."""
-        url = f"{api_url}/api/v1/sensors/sensor_001/data?metrics=temperature,humidity&stat=average&days=10"
-        async with http_session.get(url) as response:
-            assert response.status == 200
-            data = await response.json()
+    All statistics come from one multi-stat request; the None entry omits the stat parameter
+    to exercise the server default.
+    """
 
-            assert len(data["results"]) == 1
-            result = data["results"][0]
-            assert result["sensor_id"] == "sensor_001"
+    url = api_url + URLS["sensor_001_10d"]
+    (status, data), (_, default_metrics) = await asyncio.gather(
+        get_json(http_session, f"{url}&stat=min,max,sum,average"), get_metrics(http_session, url)
+    )
+    assert status == 200
 
-            metrics_by_name = {m["metric"]: m for m in result["metrics"]}
-            assert metrics_by_name["temperature"]["value"] == 400.0  # (1000+1000)/5
-            assert metrics_by_name["temperature"]["statistic"] == "average"
-            assert metrics_by_name["humidity"]["value"] == 40.0  # (10+20+30+40+100)/5
-            assert metrics_by_name["humidity"]["statistic"] == "average"
+    stats: dict[str | None, dict[str, dict]] = {None: default_metrics}
+    for m in data["results"][0]["metrics"]:
+        stats.setdefault(m["statistic"], {})[m["metric"]] = m
+    return stats
 
-    @pytest.mark.asyncio
-    async def test_multiple_sensors_query(self, http_session: aiohttp.ClientSession, api_url: str, test_data_setup):
-        """Test: Query multiple sensors."""
-        url = f"{api_url}/api/v1/sensors/data?sensors=sensor_001,sensor_002&metrics=temperature&stat=average&days=10"
-        async with http_session.get(url) as response:
-            assert response.status == 200
-            data = await response.json()
 
-            results_by_sensor = {r["sensor_id"]: r for r in data["results"]}
+@pytest_asyncio.fixture(scope="session")
+async def sensor_001_readings(http_session, api_url, test_data_setup) -> dict[str, list[float]]:
+    """sensor_001 raw temperature/humidity values over 10 days keyed by metric, fetched once."""
+    status, data = await get_json(http_session, api_url + URLS["sensor_001_raw_10d"])
+    assert status == 200
+    assert data["truncated"] is False
 
-            assert "sensor_001" in results_by_sensor
-            assert "sensor_002" in results_by_sensor
+    values: dict[str, list[float]] = {}
+    for reading in data["results"]:
+        for metric, value in reading["metrics"].items():
+            values.setdefault(metric, []).append(value)
+    return values
 
-            for sensor_id in ["sensor_001", "sensor_002"]:
-                result = results_by_sensor[sensor_id]
-                assert len(result["metrics"]) == 1
-                temp_metric = result["metrics"][0]
-                assert temp_metric["metric"] == "temperature"
-                assert isinstance(temp_metric["value"], (int, float))
 
-    @pytest.mark.asyncio
-    async def test_statistics_min(self, http_session: aiohttp.ClientSession, api_url: str, test_data_setup):
-        """Test: MIN statistic with exact assertions."""
-        url = f"{api_url}/api/v1/sensors/sensor_001/data?metrics=temperature,humidity&stat=min&days=10"
-        async with http_session.get(url) as response:
-            assert response.status == 200
-            data = await response.json()
+@pytest_asyncio.fixture(scope="session")
+async def sensor_001_avg(http_session, api_url, test_data_setup) -> tuple[dict, dict[str, dict]]:
+    """sensor_001 temperature/humidity 10-day average response and its metrics keyed by name, fetched once."""
+    return await get_metrics(http_session, api_url + URLS["sensor_001_avg_10d"])
 
-            result = data["results"][0]
-            metrics_by_name = {m["metric"]: m for m in result["metrics"]}
 
-            assert metrics_by_name["temperature"]["value"] == 100.0  # min(100,200,300,400,1000)
-            assert metrics_by_name["temperature"]["statistic"] == "min"
-            assert metrics_by_name["humidity"]["value"] == 10.0  # min(10,20,30,40,100)
-            assert metrics_by_name["humidity"]["statistic"] == "min"
+class TestSensorAPICore:
+    """Test core sensor API requirements with exact data and assertions."""
 
     @pytest.mark.asyncio
-    async def test_statistics_max(self, http_session: aiohttp.ClientSession, api_url: str, test_data_setup):
-        """Test: MAX statistic with exact assertions."""
-        url = f"{api_url}/api/v1/sensors/sensor_001/data?metrics=temperature,humidity&stat=max&days=10"
-        async with http_session.get(url) as response:
-            assert response.status == 200
-            data = await response.json()
-
-            result = data["results"][0]
-            metrics_by_name = {m["metric"]: m for m in result["metrics"]}
+    @pytest.mark.xdist_group("ingest")
+    async def test_api_receives_new_metric_values(
+        self, http_session: aiohttp.ClientSession, api_url: str, clock: SimpleNamespace
+    ):
+        """Test: The application can receive new metric values via API call."""
+        payload = {
+            "location": "location_3",
+            "sensor_type": "test_sensor",
+            "metrics": {"temperature": 100.0, "humidity": 200.0},
+            "timestamp": clock.now.isoformat(),
+        }
 
-            assert metrics_by_name["temperature"]["value"] == 1000.0  # max(100,200,300,400,1000)
-            assert metrics_by_name["temperature"]["statistic"] == "max"
-            assert metrics_by_name["humidity"]["value"] == 100.0  # max(10,20,30,40,100)
-            assert metrics_by_name["humidity"]["statistic"] == "max"
+        url = f"{api_url}/api/v1/sensors/test_ingest/data"
+        async with http_session.post(url, data=orjson.dumps(payload), headers=_JSON_HEADERS) as response:
+            assert response.status == 201
+            data = orjson.loads(await response.read())
+        assert data["message"] == "Sensor data stored successfully"
+        assert data["sensor_id"] == "test_ingest"
 
     @pytest.mark.asyncio
-    async def test_statistics_sum(self, http_session: aiohttp.ClientSession, api_url: str, test_data_setup):
-        """Test: SUM statistic with exact assertions."""
-        url = f"{api_url}/api/v1/sensors/sensor_001/data?metrics=temperature,humidity&stat=sum&days=10"
-        async with http_session.get(url) as response:
-            assert response.status == 200
-            data = await response.json()
+    @pytest.mark.xdist_group("ingest")
+    @pytest.mark.parametrize(
+        ("content_type", "expected_status", "minutes_back"),
+        [
+            ("application/json; charset=utf-8", 201, 1),
+            (" Application/JSON", 201, 2),
+            ("text/json", 400, 3),
+            ("application/jsonp", 400, 4),
+        ],
+        ids=["charset", "case-and-whitespace", "text-json", "jsonp"],
+    )
+    async def test_ingest_content_type(
+        self,
+        http_session: aiohttp.ClientSession,
+        api_url: str,
+        clock: SimpleNamespace,
+        content_type: str,
+        expected_status: int,
+        minutes_back: int,
+    ):
+        """Test: ingest accepts only the application/json media type, with or without parameters."""
+        payload = {
+            "location": "location_3",
+            "sensor_type": "test_sensor",
+            "metrics": {"temperature": 100.0},
+            # Distinct timestamps keep accepted rows from colliding with each other and the test above
+            "timestamp": (clock.now - timedelta(minutes=minutes_back)).isoformat(),
+        }
 
-            result = data["results"][0]
-            metrics_by_name = {m["metric"]: m for m in result["metrics"]}
+        url = f"{api_url}/api/v1/sensors/test_ingest/data"
+        headers = {"Content-Type": content_type}
+        async with http_session.post(url, data=orjson.dumps(payload), headers=headers) as response:
+            assert response.status == expected_status
 
-            assert metrics_by_name["temperature"]["value"] == 2000.0  # sum(100+200+300+400+1000)
-            assert metrics_by_name["temperature"]["statistic"] == "sum"
-            assert metrics_by_name["humidity"]["value"] == 200.0  # sum(10+20+30+40+100)
-            assert metrics_by_name["humidity"]["statistic"] == "sum"
+    def test_single_sensor_query(self, sensor_001_avg: tuple[dict, dict[str, dict]]):
+        """Test: Query single sensor with known data."""
+        data, metrics_by_name = sensor_001_avg
 
-    @pytest.mark.asyncio
-    async def test_statistics_average(self, http_session: aiohttp.ClientSession, api_url: str, test_data_setup):
-        """Test: AVERAGE statistic with exact assertions."""
-        url = f"{api_url}/api/v1/sensors/sensor_001/data?metrics=temperature,humidity&stat=average&days=10"
-        async with http_session.get(url) as response:
-            assert response.status == 200
-            data = await response.json()
+        assert len(data["results"]) == 1
+        assert data["results"][0]["sensor_id"] == "sensor_001"
 
-            result = data["results"][0]
-            metrics_by_name = {m["metric"]: m for m in result["metrics"]}
+        assert metrics_by_name["temperature"]["value"] == 400.0  # (1000+1000)/5
+        assert metrics_by_name["temperature"]["statistic"] == "average"
+        assert metrics_by_name["humidity"]["value"] == 40.0  # (10+20+30+40+100)/5
+        assert metrics_by_name["humidity"]["statistic"] == "average"
 
-            assert metrics_by_name["temperature"]["value"] == 400.0  # average(100+200+300+400+1000)/5
-            assert metrics_by_name["temperature"]["statistic"] == "average"
-            assert metrics_by_name["humidity"]["value"] == 40.0  # average(10+20+30+40+100)/5
-            assert metrics_by_name["humidity"]["statistic"] == "average"
+    @pytest.mark.asyncio
+    async def test_multi_sensor_queries(self, http_session: aiohttp.ClientSession, api_url: str, test_data_setup):
+        """Test: Multi-sensor endpoint with a sensor list, all sensors, and complete defaults, queried concurrently."""
+        (multi_status, multi), (all_status, all_sensors), (defaults_status, defaults) = await asyncio.gather(
+            get_json(http_session, api_url + URLS["multi_temp_avg_10d"]),
+            get_json(http_session, api_url + URLS["all_sensors_temp_avg_10d"]),
+            get_json(http_session, api_url + URLS["all_defaults"]),
+        )
+
+        # Query multiple sensors
+        assert multi_status == 200
+        results_by_sensor = {r["sensor_id"]: r for r in multi["results"]}
+
+        assert "sensor_001" in results_by_sensor
+        assert "sensor_002" in results_by_sensor
+
+        for sensor_id in ["sensor_001", "sensor_002"]:
+            result = results_by_sensor[sensor_id]
+            assert len(result["metrics"]) == 1
+            temp_metric = result["metrics"][0]
+            assert temp_metric["metric"] == "temperature"
+            assert isinstance(temp_metric["value"], (int, float))
+
+        # Query all sensors (no sensors parameter specified)
+        assert all_status == 200
+        all_sensor_ids = {r["sensor_id"] for r in all_sensors["results"]}
+        assert "sensor_001" in all_sensor_ids
+        assert "sensor_002" in all_sensor_ids
+
+        # All defaults - average for all sensors, all metrics, last 1 day
+        assert defaults_status == 200
+        sensor_ids = {r["sensor_id"] for r in defaults["results"]}
+        assert "sensor_001" in sensor_ids
+        assert "sensor_002" in sensor_ids
+
+        sensor_001_result = next(r for r in defaults["results"] if r["sensor_id"] == "sensor_001")
+        metrics_by_name = {m["metric"]: m for m in sensor_001_result["metrics"]}
+
+        for _metric_name, metric_data in metrics_by_name.items():
+            assert metric_data["statistic"] == "average"
+
+    @pytest.mark.parametrize(
+        ("stat", "expected_temp", "expected_hum"),
+        [
+            ("min", 100.0, 10.0),  # min(100,200,300,400,1000), min(10,20,30,40,100)
+            ("max", 1000.0, 100.0),  # max(100,200,300,400,1000), max(10,20,30,40,100)
+            ("sum", 2000.0, 200.0),  # sum(100+200+300+400+1000), sum(10+20+30+40+100)
+            ("average", 400.0, 40.0),  # (100+200+300+400+1000)/5, (10+20+30+40+100)/5
+        ],
+        ids=["min", "max", "sum", "average"],
+    )
+    def test_statistics(
+        self,
+        sensor_001_stats: dict[str | None, dict[str, dict]],
+        stat: str,
+        expected_temp: float,
+        expected_hum: float,
+    ):
+        """Test: each statistic over the sensor_001 data, as computed by the server."""
+        metrics_by_name = sensor_001_stats[stat]
+
+        assert metrics_by_name["temperature"]["statistic"] == stat
+        assert metrics_by_name["temperature"]["value"] == expected_temp
+        assert metrics_by_name["humidity"]["statistic"] == stat
+        assert metrics_by_name["humidity"]["value"] == expected_hum
+
+    def test_server_statistics_match_readings(
+        self,
+        sensor_001_stats: dict[str | None, dict[str, dict]],
+        sensor_001_readings: dict[str, list[float]],
+    ):
+        """Test: server-side aggregates, including the default statistic, agree with the raw readings."""
+        assert set(sensor_001_stats) == {None, "min", "max", "sum", "average"}
+        assert set(sensor_001_readings) == {"temperature", "humidity"}
+        for stat, metrics_by_name in sensor_001_stats.items():
+            expected_stat = stat or "average"
+            aggregate = _STAT_FUNCS[expected_stat]
+            for metric, values in sensor_001_readings.items():
+                assert metrics_by_name[metric]["statistic"] == expected_stat
+                assert metrics_by_name[metric]["value"] == pytest.approx(aggregate(values))
 
     @pytest.mark.asyncio
     async def test_date_range_days_parameter(self, http_session: aiohttp.ClientSession, api_url: str, test_data_setup):
         """Test: Date range specified by days parameter."""
-        url = f"{api_url}/api/v1/sensors/sensor_001/data?metrics=temperature&stat=average&days=2"
-        async with http_session.get(url) as response:
-            assert response.status == 200
-            data = await response.json()
+        url = api_url + URLS["sensor_001_temp_avg_2d"]
+        status, data = await get_json(http_session, url)
+        assert status == 200
 
-            assert len(data["results"]) == 1
-            result = data["results"][0]
-            assert result["sensor_id"] == "sensor_001"
+        assert len(data["results"]) == 1
+        result = data["results"][0]
+        assert result["sensor_id"] == "sensor_001"
 
-            assert len(result["metrics"]) == 1
-            temp_metric = result["metrics"][0]
-            assert temp_metric["metric"] == "temperature"
-            assert temp_metric["value"] == 1000.0
+        assert len(result["metrics"]) == 1
+        temp_metric = result["metrics"][0]
+        assert temp_metric["metric"] == "temperature"
+        assert temp_metric["value"] == 1000.0
 
     @pytest.mark.asyncio
     async def test_default_latest_data_query(self, http_session: aiohttp.ClientSession, api_url: str, test_data_setup):
         """Test: Default behavior queries latest data (1 day) when no date range specified."""
-        url = f"{api_url}/api/v1/sensors/sensor_001/data?metrics=temperature"
-        async with http_session.get(url) as response:
-            assert response.status == 200
-            data = await response.json()
+        url = api_url + URLS["sensor_001_temp_defaults"]
+        status, data = await get_json(http_session, url)
+        assert status == 200
 
-            assert len(data["results"]) == 1
-            result = data["results"][0]
-            temp_metric = result["metrics"][0]
-            assert temp_metric["value"] == 1000.0
+        assert len(data["results"]) == 1
+        result = data["results"][0]
+        temp_metric = result["metrics"][0]
+        assert temp_metric["value"] == 1000.0
 
     @pytest.mark.asyncio
     async def test_example_query_average_temp_humidity_last_week(
         self, http_session: aiohttp.ClientSession, api_url: str, test_data_setup
     ):
         """Test: Example query - average temperature and humidity for sensor 1 in last week."""
-        url = f"{api_url}/api/v1/sensors/sensor_001/data?metrics=temperature,humidity&stat=average&days=7"
-        async with http_session.get(url) as response:
-            assert response.status == 200
-            data = await response.json()
+        url = api_url + URLS["sensor_001_avg_7d"]
+        data, metrics_by_name = await get_metrics(http_session, url)
 
-            assert len(data["results"]) == 1
-            result = data["results"][0]
-            assert result["sensor_id"] == "sensor_001"
+        assert len(data["results"]) == 1
+        assert data["results"][0]["sensor_id"] == "sensor_001"
 
-            metrics_by_name = {m["metric"]: m for m in result["metrics"]}
+        assert "temperature" in metrics_by_name
+        assert "humidity" in metrics_by_name
 
-            assert "temperature" in metrics_by_name
-            assert "humidity" in metrics_by_name
+        assert metrics_by_name["temperature"]["statistic"] == "average"
+        assert metrics_by_name["humidity"]["statistic"] == "average"
 
-            assert metrics_by_name["temperature"]["statistic"] == "average"
-            assert metrics_by_name["humidity"]["statistic"] == "average"
-
-            assert metrics_by_name["temperature"]["value"] == 1000.0
-            assert metrics_by_name["humidity"]["value"] == 100.0
-
-    @pytest.mark.asyncio
-    async def test_all_sensors_query(self, http_session: aiohttp.ClientSession, api_url: str, test_data_setup):
-        """Test: Query all sensors (no sensors parameter specified)."""
-        url = f"{api_url}/api/v1/sensors/data?metrics=temperature&stat=average&days=10"
-        async with http_session.get(url) as response:
-            assert response.status == 200
-            data = await response.json()
-
-            sensor_ids = {r["sensor_id"] for r in data["results"]}
-            assert "sensor_001" in sensor_ids
-            assert "sensor_002" in sensor_ids
+        assert metrics_by_name["temperature"]["value"] == 1000.0
+        assert metrics_by_name["humidity"]["value"] == 100.0
 
     @pytest.mark.asyncio
     async def test_all_metrics_query(self, http_session: aiohttp.ClientSession, api_url: str, test_data_setup):
         """Test: Query all metrics (no metrics parameter specified)."""
-        url = f"{api_url}/api/v1/sensors/sensor_001/data?stat=average&days=10"
-        async with http_session.get(url) as response:
-            assert response.status == 200
-            data = await response.json()
-
-            result = data["results"][0]
-            metrics_by_name = {m["metric"]: m for m in result["metrics"]}
-
-            assert "temperature" in metrics_by_name
-            assert "humidity" in metrics_by_name
+        url = api_url + URLS["sensor_001_all_metrics_avg_10d"]
+        _, metrics_by_name = await get_metrics(http_session, url)
 
-    @pytest.mark.asyncio
-    async def test_default_average_statistic(self, http_session: aiohttp.ClientSession, api_url: str, test_data_setup):
-        """Test: Default statistic is average when not specified."""
-        url = f"{api_url}/api/v1/sensors/sensor_001/data?metrics=temperature&days=10"
-        async with http_session.get(url) as response:
-            assert response.status == 200
-            data = await response.json()
-
-            result = data["results"][0]
-            temp_metric = result["metrics"][0]
-            assert temp_metric["statistic"] == "average"
-            assert temp_metric["value"] == 400.0
-
-    @pytest.mark.asyncio
-    async def test_complete_defaults_query(self, http_session: aiohttp.ClientSession, api_url: str, test_data_setup):
-        """Test: All defaults - average for all sensors, all metrics, last 1 day."""
-        url = f"{api_url}/api/v1/sensors/data"
-        async with http_session.get(url) as response:
-            assert response.status == 200
-            data = await response.json()
-
-            sensor_ids = {r["sensor_id"] for r in data["results"]}
-            assert "sensor_001" in sensor_ids
-            assert "sensor_002" in sensor_ids
-
-            sensor_001_result = next(r for r in data["results"] if r["sensor_id"] == "sensor_001")
-            metrics_by_name = {m["metric"]: m for m in sensor_001_result["metrics"]}
-
-            for _metric_name, metric_data in metrics_by_name.items():
-                assert metric_data["statistic"] == "average"
+        assert "temperature" in metrics_by_name
+        assert "humidity" in metrics_by_name
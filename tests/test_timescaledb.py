@@ -0,0 +1,266 @@
+import statistics
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+import pytest_asyncio
+
+from sensor_api.data.models import SensorQuery, Statistic
+from sensor_api.storage import timescaledb
+from sensor_api.storage.timescaledb import TimescaleDBHandler, _build_rollup_sql
+
+_METRICS = ("temperature", "humidity")
+_STATISTICS = tuple(Statistic.__members__.values())
+# An average between other statistics, so the partials after its sum/count pairs shift
+_MIXED_STATISTICS = (Statistic.MIN, Statistic.AVG, Statistic.MAX)
+
+# Client-side equivalents of the server's statistics
+_STAT_FUNCS = {Statistic.MIN: min, Statistic.MAX: max, Statistic.SUM: sum, Statistic.AVG: statistics.fmean}
+
+
+# Start of the first rollup test hour, fixed at import so seeding and queries agree; inside the cleanup time bound
+_ROLLUP_HOUR = datetime.now(UTC).replace(minute=0, second=0, microsecond=0) - timedelta(days=3)
+# Partial hours at both edges around two whole hours
+_ROLLUP_WINDOW = (_ROLLUP_HOUR + timedelta(minutes=20), _ROLLUP_HOUR + timedelta(hours=3, minutes=40))
+# (timestamp, temperature, humidity) rows for test_rollup
+_ROLLUP_ROWS: list[tuple[datetime, float, float | None]] = [
+    (_ROLLUP_HOUR + timedelta(minutes=10), 900.0, 90.0),  # before the window, same hour as its start
+    (_ROLLUP_HOUR + timedelta(minutes=30), 10.0, 1.0),  # leading partial hour
+    (_ROLLUP_HOUR + timedelta(hours=1, minutes=5), 20.0, None),  # whole hour, humidity not recorded
+    (_ROLLUP_HOUR + timedelta(hours=1, minutes=45), 30.0, 3.0),
+    (_ROLLUP_HOUR + timedelta(hours=2, minutes=15), 45.0, 4.5),  # whole hour
+    (_ROLLUP_HOUR + timedelta(hours=3, minutes=10), 60.0, 6.0),  # trailing partial hour
+    (_ROLLUP_HOUR + timedelta(hours=3, minutes=50), 800.0, 80.0),  # after the window, same hour as its end
+]
+
+
+class _FakeConnection:
+    """Stands in for an asyncpg connection; every fetch returns the same rows and is counted."""
+
+    def __init__(self, rows: list[tuple[Any, ...]]):
+        self.rows = rows
+        self.fetches = 0
+
+    async def fetch(self, sql: str, *args: Any) -> list[tuple[Any, ...]]:
+        self.fetches += 1
+        return self.rows
+
+
+def _window_query(end: datetime, days: int = 1) -> SensorQuery:
+    """Average sensor_001 temperature over the days before end."""
+    return SensorQuery(
+        sensor_ids=("sensor_001",), metrics=("temperature",), start_date=end - timedelta(days=days), end_date=end
+    )
+
+
+def _expected(stats: tuple[Statistic, ...]) -> dict[tuple[str, str], float]:
+    """Aggregates of the in-window rows, keyed by (metric, statistic)."""
+    start, end = _ROLLUP_WINDOW
+    in_window = [(temperature, humidity) for ts, temperature, humidity in _ROLLUP_ROWS if start <= ts <= end]
+    expected = {}
+    for stat in stats:
+        for metric, column in zip(_METRICS, zip(*in_window, strict=True), strict=True):
+            values = [value for value in column if value is not None]
+            expected[(metric, stat.value)] = _STAT_FUNCS[stat](values)
+    return expected
+
+
+class TestRollupSql:
+    """Test the column layout of the rollup query template."""
+
+    def test_average_uses_sum_count_pairs(self):
+        """Test: each average reads a sum/count partial pair, shifting later partial aliases by two."""
+        sql = _build_rollup_sql((Statistic.AVG,), _METRICS, False)
+
+        assert sql.startswith("SELECT sensor_id, sum(p0) / nullif(sum(p1), 0), sum(p2) / nullif(sum(p3), 0) FROM (")
+        assert "SELECT sensor_id, temperature_sum, temperature_count, humidity_sum, humidity_count " in sql
+        assert "SELECT sensor_id, sum(temperature), count(temperature), sum(humidity), count(humidity) " in sql
+        assert sql.endswith(") AS parts (sensor_id, p0, p1, p2, p3) GROUP BY sensor_id")
+
+    def test_mixed_statistics_are_statistic_major(self):
+        """Test: with an average between other statistics, every later outer column reads the right partial."""
+        sql = _build_rollup_sql(_MIXED_STATISTICS, _METRICS, True)
+
+        assert sql.startswith(
+            "SELECT sensor_id, min(p0), min(p1), sum(p2) / nullif(sum(p3), 0), sum(p4) / nullif(sum(p5), 0), "
+            "max(p6), max(p7) FROM ("
+        )
+        assert (
+            "SELECT sensor_id, temperature_min, humidity_min, temperature_sum, temperature_count, "
+            "humidity_sum, humidity_count, temperature_max, humidity_max FROM sensor_metrics_hourly "
+        ) in sql
+        assert sql.endswith(") AS parts (sensor_id, p0, p1, p2, p3, p4, p5, p6, p7) GROUP BY sensor_id")
+
+
+@pytest_asyncio.fixture
+async def fake_connection(monkeypatch: pytest.MonkeyPatch) -> AsyncIterator[tuple[TimescaleDBHandler, _FakeConnection]]:
+    """An unstarted handler with a one-minute query cache whose queries go to a fake connection."""
+    storage = TimescaleDBHandler(query_cache_ttl=60)
+    conn = _FakeConnection([])
+
+    @asynccontextmanager
+    async def get_raw_connection() -> AsyncIterator[_FakeConnection]:
+        yield conn
+
+    monkeypatch.setattr(storage, "get_raw_connection", get_raw_connection)
+    yield storage, conn
+    await storage.close()
+
+
+class TestQueryColumns:
+    """Test how aggregate result columns map back to metrics and statistics."""
+
+    @pytest.mark.asyncio
+    async def test_multi_statistic_columns_are_statistic_major(
+        self, fake_connection: tuple[TimescaleDBHandler, _FakeConnection]
+    ):
+        """Test: value columns are read as every metric for the first statistic, then the next."""
+        storage, conn = fake_connection
+        conn.rows = [("sensor_001", 1.0, 2.0, 3.0, None, 5.0, 6.0)]
+        query = SensorQuery(sensor_ids=("sensor_001",), metrics=_METRICS, statistics=_MIXED_STATISTICS)
+
+        (result,) = await storage.query_sensor_data(query)
+
+        assert [(m.metric, m.statistic, m.value) for m in result.metrics] == [
+            ("temperature", "min", 1.0),
+            ("humidity", "min", 2.0),
+            ("temperature", "average", 3.0),
+            # A NULL aggregate is left out
+            ("temperature", "max", 5.0),
+            ("humidity", "max", 6.0),
+        ]
+
+
+class TestQueryCache:
+    """Test reuse and invalidation of cached aggregate results."""
+
+    @pytest.mark.asyncio
+    async def test_hit_is_stamped_with_request_window_end(
+        self, fake_connection: tuple[TimescaleDBHandler, _FakeConnection]
+    ):
+        """Test: a sliding window of the same length is served from cache, stamped with the new window end."""
+        storage, conn = fake_connection
+        conn.rows = [("sensor_001", 1.0)]
+        end = datetime.now(UTC)
+
+        (first,) = await storage.query_sensor_data(_window_query(end))
+        (second,) = await storage.query_sensor_data(_window_query(end + timedelta(seconds=1)))
+
+        assert conn.fetches == 1
+        assert first.timestamp == end
+        assert second.timestamp == end + timedelta(seconds=1)
+        assert second.metrics == first.metrics
+
+    @pytest.mark.asyncio
+    async def test_ingest_invalidates(
+        self, fake_connection: tuple[TimescaleDBHandler, _FakeConnection], monkeypatch: pytest.MonkeyPatch
+    ):
+        """Test: a record stored through the handler makes the next identical query refetch."""
+        storage, conn = fake_connection
+        conn.rows = [("sensor_001", 1.0)]
+
+        async def copy_records(records: list[Any]) -> None:
+            pass
+
+        monkeypatch.setattr(storage, "_copy_records", copy_records)
+        end = datetime.now(UTC)
+
+        await storage.query_sensor_data(_window_query(end))
+        await storage.store_record((end, "sensor_001", "location_1", "sensor_type_1", 2.0, None, None))
+        await storage.query_sensor_data(_window_query(end))
+
+        assert conn.fetches == 2
+
+    @pytest.mark.asyncio
+    async def test_expired_entry_is_refetched(
+        self, fake_connection: tuple[TimescaleDBHandler, _FakeConnection], monkeypatch: pytest.MonkeyPatch
+    ):
+        """Test: an entry is reused within the TTL and refetched once it has expired."""
+        storage, conn = fake_connection
+        conn.rows = [("sensor_001", 1.0)]
+        clock = SimpleNamespace(now=1000.0)
+        monkeypatch.setattr(timescaledb, "time", SimpleNamespace(monotonic=lambda: clock.now))
+        end = datetime.now(UTC)
+
+        await storage.query_sensor_data(_window_query(end))
+        clock.now += storage.query_cache_ttl - 1
+        await storage.query_sensor_data(_window_query(end))
+        assert conn.fetches == 1
+
+        clock.now += 1
+        await storage.query_sensor_data(_window_query(end))
+        assert conn.fetches == 2
+
+    @pytest.mark.asyncio
+    async def test_least_recently_used_entry_is_evicted(
+        self, fake_connection: tuple[TimescaleDBHandler, _FakeConnection], monkeypatch: pytest.MonkeyPatch
+    ):
+        """Test: past QUERY_CACHE_SIZE entries, the least recently used one is dropped."""
+        storage, conn = fake_connection
+        conn.rows = [("sensor_001", 1.0)]
+        monkeypatch.setattr(timescaledb, "QUERY_CACHE_SIZE", 2)
+        end = datetime.now(UTC)
+
+        await storage.query_sensor_data(_window_query(end, days=1))
+        await storage.query_sensor_data(_window_query(end, days=2))
+        await storage.query_sensor_data(_window_query(end, days=1))  # hit, now most recently used
+        await storage.query_sensor_data(_window_query(end, days=3))  # evicts days=2
+        assert conn.fetches == 3
+
+        await storage.query_sensor_data(_window_query(end, days=1))
+        assert conn.fetches == 3
+        await storage.query_sensor_data(_window_query(end, days=2))
+        assert conn.fetches == 4
+
+
+@pytest_asyncio.fixture(scope="module")
+async def rollup_storage():
+    """A started handler with the test_rollup rows stored and rolled up; query caching is off."""
+    storage = TimescaleDBHandler(query_cache_ttl=0)
+    await storage.start()
+    # Rows left behind by an interrupted run would collide with the ones stored below
+    async with storage.get_raw_connection() as conn:
+        await conn.execute("DELETE FROM sensor_metrics WHERE sensor_id = 'test_rollup'")
+    for timestamp, temperature, humidity in _ROLLUP_ROWS:
+        await storage.store_record((timestamp, "test_rollup", "location_4", "test_sensor", temperature, humidity, None))
+    # The rows are backfilled below the refresh policy's watermark, so materialize their buckets explicitly
+    async with storage.get_raw_connection() as conn:
+        await conn.execute(
+            "CALL refresh_continuous_aggregate('sensor_metrics_hourly', $1, $2)",
+            _ROLLUP_HOUR,
+            _ROLLUP_HOUR + timedelta(hours=4),
+        )
+    yield storage
+    await storage.close()
+
+
+@pytest.mark.xdist_group("rollup")
+class TestRollupQueries:
+    """Test that hourly rollup queries agree with raw aggregate queries over the same window."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "stats",
+        [*((stat,) for stat in _STATISTICS), _MIXED_STATISTICS],
+        ids=[*(stat.value for stat in _STATISTICS), "min-average-max"],
+    )
+    async def test_rollup_matches_raw(self, rollup_storage: TimescaleDBHandler, stats: tuple[Statistic, ...]):
+        """Test: the rollup and raw templates return the same per-metric aggregates."""
+        start, end = _ROLLUP_WINDOW
+        query = SensorQuery(
+            sensor_ids=("test_rollup",), metrics=_METRICS, statistics=stats, start_date=start, end_date=end
+        )
+
+        results = {}
+        for use_rollups in (False, True):
+            rollup_storage.use_rollups = use_rollups
+            (result,) = await rollup_storage.query_sensor_data(query)
+            assert result.sensor_id == "test_rollup"
+            results[use_rollups] = {(m.metric, m.statistic): m.value for m in result.metrics}
+
+        expected = _expected(stats)
+        assert results[False] == pytest.approx(expected)
+        assert results[True] == pytest.approx(expected)